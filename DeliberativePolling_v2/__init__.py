@@ -1,24 +1,25 @@
 import os
 import re
-import time
-import threading
+import copy
 import pandas as pd
 import numpy as np
-import openpyxl
 import warnings
-import pyreadstat
-import statsmodels
-import statsmodels.stats.weightstats
-from scipy.stats import chi2_contingency
+from scipy import special
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
 from itertools import combinations, product
 from tqdm import tqdm
+from xml.sax.saxutils import escape
 from docx import Document
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
+from docx.oxml.ns import qn, nsdecls
+from docx.oxml import OxmlElement, parse_xml
 from docx.shared import Pt, RGBColor, Inches
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
 
-warnings.filterwarnings("ignore")
+
+def _silence_warnings():
+    if not os.environ.get("DELIBERATIVEPOLLING_SHOW_WARNINGS"):
+        warnings.filterwarnings("ignore")
 
 
 def outputs(file, fast=False):
@@ -30,8 +31,38 @@ def outputs(file, fast=False):
         ".sav"
     ), 'File must be a .sav file from IBM SPSS Statistics. See pypi.org/project/DeliberativePolling for "How To" guide for this package.'
 
+    # Only the parent process reads the .sav file, so worker processes
+    # never pay for this import.
+    import pyreadstat
+
+    _silence_warnings()
+
     values, codebook = pyreadstat.read_sav(file, apply_value_formats=False)
-    labels = pyreadstat.read_sav(file, apply_value_formats=True)[0]
+    labels = pyreadstat.set_value_labels(values, codebook, formats_as_category=True)
+
+    # Give every column its own contiguous buffer so the repeated
+    # column-wise masks and groupbys downstream read sequential memory.
+    values = pd.DataFrame({column: values[column].array.copy() for column in values})
+    labels = pd.DataFrame({column: labels[column].array.copy() for column in labels})
+
+    codebook.label_of = dict(zip(codebook.column_names, codebook.column_labels))
+    codebook.variable_measure.pop("Group", None)
+    codebook.variable_measure.pop("Time", None)
+    codebook.variable_measure.pop("ID", None)
+    codebook.nominal_variables = [
+        key
+        for key, measure in codebook.variable_measure.items()
+        if measure == "nominal"
+    ]
+    codebook.ordinal_variables = [
+        key
+        for key, measure in codebook.variable_measure.items()
+        if measure == "ordinal"
+    ]
+    codebook.value_label_order = {
+        variable: list(dict.fromkeys(value_labels.values()))
+        for variable, value_labels in codebook.variable_value_labels.items()
+    }
 
     scale_variables = [
         key for key, measure in codebook.variable_measure.items() if measure == "scale"
@@ -67,89 +98,118 @@ def outputs(file, fast=False):
         if not (comb[0][0] == comb[1][0] and comb[0][2] != comb[1][2])
     ]
 
-    for combination in tqdm(
-        sample_comparisons,
-        position=0,
-        desc="Comparing Weighted Sampling",
-        leave=True,
-    ):
+    group_time_indices = values.groupby(["Group", "Time"]).indices
+    subsamples = {
+        (group, time, weight): subsample(
+            group, time, weight, values, labels, group_time_indices
+        )
+        for group, time, weight in product(
+            values["Group"].unique(), values["Time"].unique(), weights
+        )
+    }
 
-        class sample:
-            one = subsample(
-                combination[0][0],
-                combination[0][1],
-                combination[0][2],
-                values,
-                labels,
-            )
-            two = subsample(
-                combination[1][0],
-                combination[1][1],
-                combination[1][2],
-                values,
-                labels,
-            )
-            all_values = values
-            all_labels = labels
-            metadata = codebook
-            name = comparison_name(one, two)
-            paired = str(one.group) + one.weight == str(two.group) + two.weight
-
-        if sample.one.values["ID"].duplicated().any():
-            raise ValueError(f'Duplicate IDs in "{sample.one.name}" found.')
-        if sample.two.values["ID"].duplicated().any():
-            raise ValueError(f'Duplicate IDs in "{sample.two.name}" found.')
-        if (
-            sample.paired
-            and len(
-                set(sample.one.values["ID"]).intersection(set(sample.two.values["ID"]))
-            )
-            == 0
+    time_directories = []
+    seen_directories = set()
+    for combination in sample_comparisons:
+        forward = f"{combination[0][1]} v. {combination[1][1]}"
+        reverse = f"{combination[1][1]} v. {combination[0][1]}"
+        directory = reverse if reverse in seen_directories else forward
+        seen_directories.add(directory)
+        time_directories.append(directory)
+
+    with ProcessPoolExecutor(
+        max_workers=os.cpu_count(),
+        initializer=_comparison_initializer,
+        initargs=(values, labels, codebook, subsamples),
+    ) as executor:
+        futures = [
+            executor.submit(_process_comparison, combination, time_directory, fast)
+            for combination, time_directory in zip(sample_comparisons, time_directories)
+        ]
+        for future in tqdm(
+            as_completed(futures),
+            total=len(futures),
+            position=0,
+            desc="Comparing Weighted Sampling",
+            leave=True,
         ):
-            raise ValueError(
-                f'No shared IDs between "{sample.one.name}" and "{sample.two.name}" were found. If the samples are not the same experimental group, they should not share the group name "{sample.one.group}".'
-            )
+            future.result()
 
-        sample.one.values.set_index(sample.one.values["ID"], inplace=True)
-        sample.two.values.set_index(sample.two.values["ID"], inplace=True)
-        sample.one.labels.set_index(sample.one.values["ID"], inplace=True)
-        sample.two.labels.set_index(sample.two.values["ID"], inplace=True)
+    print('Analysis complete. See "Outputs" folder in directory.')
 
-        compare_samples(sample, "Nominal", fast)
-        compare_samples(sample, "Ordinal", fast)
 
-    print('Analysis complete. See "Outputs" folder in directory.')
+@dataclass
+class comparison:
+    one: "subsample"
+    two: "subsample"
+    all_values: pd.DataFrame
+    all_labels: pd.DataFrame
+    metadata: object
+    name: str
+    paired: bool
+    time_directory: str
+
+
+_comparison_data = None
+
+
+def _comparison_initializer(values, labels, codebook, subsamples):
+    global _comparison_data
+    _silence_warnings()
+    _comparison_data = (values, labels, codebook, subsamples)
+
+
+def _process_comparison(combination, time_directory, fast):
+    values, labels, codebook, subsamples = _comparison_data
+
+    one = subsamples[combination[0]].copy()
+    two = subsamples[combination[1]].copy()
+    sample = comparison(
+        one=one,
+        two=two,
+        all_values=values,
+        all_labels=labels,
+        metadata=codebook,
+        name=comparison_name(one, two),
+        paired=str(one.group) + one.weight == str(two.group) + two.weight,
+        time_directory=time_directory,
+    )
 
-    if "limit" in globals():
-        print(limit)
+    if sample.one.values["ID"].duplicated().any():
+        raise ValueError(f'Duplicate IDs in "{sample.one.name}" found.')
+    if sample.two.values["ID"].duplicated().any():
+        raise ValueError(f'Duplicate IDs in "{sample.two.name}" found.')
+    if (
+        sample.paired
+        and len(
+            set(sample.one.values["ID"]).intersection(set(sample.two.values["ID"]))
+        )
+        == 0
+    ):
+        raise ValueError(
+            f'No shared IDs between "{sample.one.name}" and "{sample.two.name}" were found. If the samples are not the same experimental group, they should not share the group name "{sample.one.group}".'
+        )
+
+    sample.one.values.set_index(sample.one.values["ID"], inplace=True)
+    sample.two.values.set_index(sample.two.values["ID"], inplace=True)
+    sample.one.labels.set_index(sample.one.values["ID"], inplace=True)
+    sample.two.labels.set_index(sample.two.values["ID"], inplace=True)
+
+    compare_samples(sample, "Nominal", fast)
+    compare_samples(sample, "Ordinal", fast)
 
 
 def compare_samples(sample, type, fast):
-    sample.crosstabs = pd.DataFrame()
-    sample.summaries = pd.DataFrame(columns=["Variable", "Summary"])
+    summary_rows = []
+    crosstab_rows = []
 
-    sample.metadata.variable_measure.pop("Group", None)
-    sample.metadata.variable_measure.pop("Time", None)
-    sample.metadata.variable_measure.pop("ID", None)
-    nominal_variables = [
-        key
-        for key, measure in sample.metadata.variable_measure.items()
-        if measure == "nominal"
-    ]
+    nominal_variables = sample.metadata.nominal_variables
     check_labels(sample, nominal_variables)
 
     if type == "Nominal":
         ordinal_variables = [1]
     else:
-        ordinal_variables = list(
-            reversed(
-                [
-                    key
-                    for key, measure in sample.metadata.variable_measure.items()
-                    if measure == "ordinal"
-                ]
-            )
-        )
+        ordinal_variables = list(reversed(sample.metadata.ordinal_variables))
         check_labels(sample, ordinal_variables)
 
     if len(nominal_variables) == 0:
@@ -230,13 +290,10 @@ def compare_samples(sample, type, fast):
                     shared_IDs
                 ] = sample.two.labels.original_nominal
 
-            for ordinal_variable in tqdm(
-                ordinal_variables,
-                position=2,
-                desc="Comparing Ordinal Variables",
-                leave=False,
-                total=len(ordinal_variables),
-            ):
+            if type == "Ordinal":
+                filter_subsamples(sample, nominal_variable)
+
+            for ordinal_variable in ordinal_variables:
                 if type == "Nominal":
                     sample.crosstab = nominal_crosstab(sample, nominal_variable)
                     sample.summary = nominal_summary(sample, nominal_variable)
@@ -247,11 +304,13 @@ def compare_samples(sample, type, fast):
                     )
                     sample.summary = ordinal_summary(sample, ordinal_variable)
 
-                sample.summary.columns = sample.summaries.columns
-                sample.summaries = pd.concat([sample.summary, sample.summaries], axis=0)
-                sample.crosstabs = crosstab_concat(sample.crosstab, sample.crosstabs)
+                summary_rows.append(sample.summary)
+                crosstab_rows.append(sample.crosstab)
 
             if type == "Ordinal":
+                sample.summaries = summaries_concat(summary_rows)
+                sample.crosstabs = crosstabs_concat(crosstab_rows)
+
                 second_header = [""] * len(sample.crosstabs.columns)
                 second_header[2] = sample.one.name
                 second_header[
@@ -268,9 +327,7 @@ def compare_samples(sample, type, fast):
                 )
                 sample.crosstabs.columns = multi_col
 
-                variable = sample.metadata.column_labels[
-                    sample.metadata.column_names.index(nominal_variable)
-                ]
+                variable = sample.metadata.label_of[nominal_variable]
                 name = document_title(sample, type, variable) + variation
 
                 export = (
@@ -285,10 +342,13 @@ def compare_samples(sample, type, fast):
                 if not fast:
                     if export:
                         write_docx(sample, name, variable)
-                sample.crosstabs = pd.DataFrame()
-                sample.summaries = pd.DataFrame(columns=["Variable", "Summary"])
+                summary_rows = []
+                crosstab_rows = []
 
     if type == "Nominal":
+        sample.summaries = summaries_concat(summary_rows)
+        sample.crosstabs = crosstabs_concat(crosstab_rows)
+
         name = document_title(sample, type, nominal_variable)
 
         write_xlsx(sample, name)
@@ -296,10 +356,28 @@ def compare_samples(sample, type, fast):
             write_docx(sample, name)
 
 
+def crosstab_percentages(aggregated, labels_ordered):
+    frequencies = aggregated.astype(float)
+    percentages = (frequencies / frequencies.sum() * 100).round(1).fillna(0.0)
+    return percentages.reindex(labels_ordered).fillna(0.0)
+
+
 def nominal_crosstab(sample, nominal_variable):
-    labels = sample.metadata.variable_value_labels[nominal_variable].values()
-    labels_ordered = []
-    [labels_ordered.append(value) for value in labels if value not in labels_ordered]
+    labels_ordered = sample.metadata.value_label_order[nominal_variable]
+
+    observed = sample.one.labels.groupby(nominal_variable, observed=True)[
+        sample.one.weight
+    ].sum()
+    expected = sample.two.labels.groupby(nominal_variable, observed=True)[
+        sample.one.weight
+    ].sum()
+
+    if sample.two.weight == sample.one.weight:
+        aggregated_two = expected
+    else:
+        aggregated_two = sample.two.labels.groupby(nominal_variable, observed=True)[
+            sample.two.weight
+        ].sum()
 
     sample.one.crosstab = crosstab_create(
         type="Nominal",
@@ -308,6 +386,7 @@ def nominal_crosstab(sample, nominal_variable):
         columns="Total",
         weight=sample.one.weight,
         labels_nominal=labels_ordered,
+        aggregated=observed,
     )
 
     sample.two.crosstab = crosstab_create(
@@ -317,12 +396,27 @@ def nominal_crosstab(sample, nominal_variable):
         columns="Total",
         weight=sample.two.weight,
         labels_nominal=labels_ordered,
+        aggregated=aggregated_two,
+    )
+
+    sample.crosstab_percentages = pd.concat(
+        [
+            crosstab_percentages(observed, labels_ordered),
+            crosstab_percentages(aggregated_two, labels_ordered),
+        ],
+        axis=1,
     )
 
     sample.crosstab = pd.concat([sample.one.crosstab, sample.two.crosstab], axis=1)
 
     sample.crosstab = sample.crosstab.reset_index()
-    sample.crosstab.insert(0, "Variable", np.nan)
+    variable_column = np.full(len(sample.crosstab), np.nan, dtype=object)
+    variable_column[0] = x_test(
+        variable=sample.metadata.label_of[nominal_variable],
+        observed=observed,
+        expected=expected,
+    )
+    sample.crosstab.insert(0, "Variable", variable_column)
     sample.crosstab.columns = [
         "Variable",
         "Label",
@@ -330,37 +424,12 @@ def nominal_crosstab(sample, nominal_variable):
         add_sample_size(sample.two.name, sample.two.values[nominal_variable]),
     ]
 
-    sample.crosstab.loc[0, "Variable"] = x_test(
-        variable=sample.metadata.column_labels[
-            sample.metadata.column_names.index(nominal_variable)
-        ],
-        observed=pd.crosstab(
-            index=sample.one.labels[nominal_variable],
-            columns="Total",
-            values=sample.one.labels[sample.one.weight],
-            aggfunc="sum",
-        ),
-        expected=pd.crosstab(
-            index=sample.two.labels[nominal_variable],
-            columns="Total",
-            values=sample.two.labels[sample.one.weight],
-            aggfunc="sum",
-        ),
-    )
-
     return sample.crosstab
 
 
 def ordinal_crosstab(sample, nominal_variable, ordinal_variable):
-    labels = sample.metadata.variable_value_labels[nominal_variable].values()
-    labels_nominal = []
-    [labels_nominal.append(value) for value in labels if value not in labels_nominal]
-    labels_nominal = labels_nominal
-
-    labels = sample.metadata.variable_value_labels[ordinal_variable].values()
-    labels_ordinal = []
-    [labels_ordinal.append(value) for value in labels if value not in labels_ordinal]
-    labels_ordinal = labels_ordinal + ["DK/NA"]
+    labels_nominal = sample.metadata.value_label_order[nominal_variable]
+    labels_ordinal = sample.metadata.value_label_order[ordinal_variable] + ["DK/NA"]
 
     sample.one.crosstab = crosstab_create(
         type="Ordinal",
@@ -391,25 +460,25 @@ def ordinal_crosstab(sample, nominal_variable, ordinal_variable):
         axis=1,
     )
 
-    sample.crosstab = (
-        sample.crosstab.fillna(0)
-        .round(1)
-        .apply(lambda x: x)
-        .applymap(lambda x: f"{x}%")
+    sample.crosstab = sample.crosstab.fillna(0).round(1)
+    sample.crosstab_percentages = sample.crosstab
+    sample.crosstab = pd.DataFrame(
+        np.char.add(sample.crosstab.to_numpy(dtype=float).astype("U32"), "%"),
+        index=sample.crosstab.index,
+        columns=sample.crosstab.columns,
     )
 
     sample.crosstab = crosstab_means(sample, nominal_variable, ordinal_variable)
 
     sample.crosstab = sample.crosstab.reset_index()
-    sample.crosstab.insert(0, "Variable", np.nan)
+    variable_column = np.full(len(sample.crosstab), np.nan, dtype=object)
+    variable_column[0] = ordinal_variable
+    sample.crosstab.insert(0, "Variable", variable_column)
     crosstab_header = sample.crosstab.columns.tolist()
     crosstab_header[0] = "Variable"
     crosstab_header[1] = "Label"
     sample.crosstab.columns = crosstab_header
-    sample.crosstab.iloc[0, 0] = ordinal_variable
-    sample.crosstab.iloc[0, 1] = sample.metadata.column_labels[
-        sample.metadata.column_names.index(ordinal_variable)
-    ]
+    sample.crosstab.iloc[0, 1] = sample.metadata.label_of[ordinal_variable]
 
     return sample.crosstab
 
@@ -419,16 +488,14 @@ def nominal_summary(sample, nominal_variable):
     crosstab = sample.crosstab.copy()
     crosstab.set_index("Label", inplace=True)
 
-    label = sample.metadata.column_labels[
-        sample.metadata.column_names.index(nominal_variable)
-    ]
+    label = sample.metadata.label_of[nominal_variable]
 
     if "P = " in crosstab.iloc[0, 0]:
         difference = dist_comparison(crosstab.iloc[0, 0].split("P = ")[1].split(")")[0])
 
         likeness, plurality1, plurality2 = plurality_comparison(
-            crosstab.iloc[:, 1],
-            crosstab.iloc[:, 2],
+            sample.crosstab_percentages.iloc[:, 0],
+            sample.crosstab_percentages.iloc[:, 1],
         )
 
         statement = f'The distribution of "{label}" {difference} between {crosstab.columns[1]} and {crosstab.columns[2]}. In {sample.two.name}, there was {plurality2} among this group, {likeness} in {sample.one.name} {plurality1}.'
@@ -446,9 +513,7 @@ def ordinal_summary(sample, ordinal_variable):
     crosstab = sample.crosstab.copy()
     crosstab.set_index("Label", inplace=True)
 
-    label = sample.metadata.column_labels[
-        sample.metadata.column_names.index(ordinal_variable)
-    ]
+    label = sample.metadata.label_of[ordinal_variable]
 
     length = int((len(crosstab.columns) - 1) / 3)
 
@@ -461,8 +526,8 @@ def ordinal_summary(sample, ordinal_variable):
 
         if type(crosstab.iloc[0, index_dif]) == str:
             likeness, plurality1, plurality2 = plurality_comparison(
-                crosstab.iloc[1:-1, index_one],
-                crosstab.iloc[1:-1, index_two],
+                sample.crosstab_percentages.iloc[:-1, index_one - 1],
+                sample.crosstab_percentages.iloc[:-1, index_two - 1],
             )
 
             difference = mean_comparison(sample, crosstab.iloc[0, index_dif])
@@ -507,25 +572,24 @@ def write_xlsx(sample, name, variable=""):
     name = re.sub(r'[<>:"/\\|?*:]', "", name)
     sheet_name = re.sub(r'[<>:"/\\|?*:]', "", sheet_name)
 
-    directory = f"Outputs/{sample.one.time} v. {sample.two.time}/{title}"
-    if os.path.exists(f"Outputs/{sample.two.time} v. {sample.one.time}"):
-        directory = f"Outputs/{sample.two.time} v. {sample.one.time}/{title}"
-    directory = f"{directory}/{variable}"
+    directory = f"Outputs/{sample.time_directory}/{title}/{variable}"
     os.makedirs(directory, exist_ok=True)
 
-    sample.crosstabs.to_excel(
-        f"{directory}/Tables - {name}",
-        sheet_name=sheet_name,
-        index=index,
-        header=True,
-    )
+    with pd.ExcelWriter(f"{directory}/Tables - {name}", engine="xlsxwriter") as writer:
+        sample.crosstabs.to_excel(
+            writer,
+            sheet_name=sheet_name,
+            index=index,
+            header=True,
+        )
 
-    sample.summaries.to_excel(
-        f"{directory}/Report - {name}",
-        sheet_name=sheet_name,
-        index=False,
-        header=True,
-    )
+    with pd.ExcelWriter(f"{directory}/Report - {name}", engine="xlsxwriter") as writer:
+        sample.summaries.to_excel(
+            writer,
+            sheet_name=sheet_name,
+            index=False,
+            header=True,
+        )
 
 
 def write_docx(sample, name, variable=""):
@@ -584,8 +648,9 @@ def write_docx(sample, name, variable=""):
                 spacer = 0
 
             rows, cols = sheet.shape
-            table = document.add_table(rows=rows + spacer, cols=cols)
+            table = document.add_table(rows=spacer, cols=cols)
             table.style = "Medium List 2"
+            column_width = table._tbl.xpath("w:tblGrid/w:gridCol")[0].get(qn("w:w"))
 
             if iterations == 0:
                 for i, column in enumerate(sheet.columns):
@@ -595,7 +660,7 @@ def write_docx(sample, name, variable=""):
                     cell.paragraphs[0].alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
                     if isinstance(column, tuple):
                         p1 = cell.add_paragraph(str(column[0]))
-                        set_font(p1)
+                        set_font_paragraph(p1)
                         p1.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
 
                         split = str(column[1]).find("(n = ")
@@ -606,41 +671,26 @@ def write_docx(sample, name, variable=""):
                             ]
                             for part in parts:
                                 p = cell.add_paragraph(part)
-                                set_font(p)
+                                set_font_paragraph(p)
                                 p.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
                         else:
                             p2 = cell.add_paragraph(str(column[1]))
-                            set_font(p2)
+                            set_font_paragraph(p2)
                             p2.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
                     else:
                         p = cell.add_paragraph(str(column))
-                        set_font(p)
+                        set_font_paragraph(p)
                         p.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
                     vertical_alignment(cell)
 
-            for i, row in enumerate(sheet.iterrows()):
-                data = row[1]
-                for j, value in enumerate(data):
-                    cell = table.cell(i + spacer, j)
-                    cell.text = str(value)
-                    set_font(cell)
-
-                    for paragraph in cell.paragraphs:
-                        if j < 2:
-                            paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.LEFT
-                        else:
-                            paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-
-                    if not len(sheet.columns) == 2:
-                        vertical_alignment(cell)
+            tall = not len(sheet.columns) == 2
+            for row in sheet.itertuples(index=False, name=None):
+                table._tbl.append(body_row_xml(row, column_width, tall))
 
         title = re.sub(r'[<>:"/\\|?*:]', "", title)
         name = re.sub(r'[<>:"/\\|?*:]', "", name)
 
-        directory = f"Outputs/{sample.one.time} v. {sample.two.time}/{title}"
-        if os.path.exists(f"Outputs/{sample.two.time} v. {sample.one.time}"):
-            directory = f"Outputs/{sample.two.time} v. {sample.one.time}/{title}"
-        directory = f"{directory}/{variable}"
+        directory = f"Outputs/{sample.time_directory}/{title}/{variable}"
         os.makedirs(directory, exist_ok=True)
 
         if len(sheet.columns) == 2:
@@ -650,7 +700,7 @@ def write_docx(sample, name, variable=""):
 
 
 def crosstab_create(
-    type, data, index, columns, weight, labels_nominal, labels_ordinal=None
+    type, data, index, columns, weight, labels_nominal, labels_ordinal=None, aggregated=None
 ):
     if type == "Nominal":
         margins = False
@@ -666,17 +716,24 @@ def crosstab_create(
         columns_data = data[columns]
         if data[columns].isna().all():
             columns_data = data[columns].cat.set_categories(labels_nominal)
-        
-    
-    absolute_frequencies = pd.crosstab(
-        index=index_data,
-        columns=columns_data,
-        values=data[weight],
-        aggfunc="sum",
-        margins=margins,
-        dropna=dropna,
-        normalize=normalize,
-    )
+
+    if aggregated is not None:
+        if len(aggregated) == 0:
+            absolute_frequencies = pd.DataFrame(
+                0.0, index=labels_nominal, columns=["Total"]
+            )
+        else:
+            absolute_frequencies = aggregated.to_frame("Total")
+    else:
+        absolute_frequencies = pd.crosstab(
+            index=index_data,
+            columns=columns_data,
+            values=data[weight],
+            aggfunc="sum",
+            margins=margins,
+            dropna=dropna,
+            normalize=normalize,
+        )
 
     if type == "Nominal":
         if len(absolute_frequencies) == 0:
@@ -694,14 +751,19 @@ def crosstab_create(
                 .fillna(0)
             )
 
-        combined_frequencies = (
-            (absolute_frequencies / absolute_frequencies.sum().sum() * 100)
-            .round(1)
-            .astype(str)
-            .replace("nan", "0.0")
-            .applymap(lambda x: f"({x}%)")
-            + " "
-            + absolute_frequencies.round().astype(int).astype(str)
+        frequencies = absolute_frequencies.to_numpy(dtype=float)
+        percentages = np.round(frequencies / frequencies.sum() * 100, 1)
+        percentages = np.where(np.isnan(percentages), 0.0, percentages)
+
+        combined_frequencies = pd.DataFrame(
+            np.char.add(
+                np.char.add(
+                    np.char.add("(", percentages.astype("U32")), "%) "
+                ),
+                np.rint(frequencies).astype(np.int64).astype("U32"),
+            ),
+            index=absolute_frequencies.index,
+            columns=absolute_frequencies.columns,
         )
 
         return (
@@ -716,6 +778,32 @@ def crosstab_create(
         ).replace("nan", "0")
 
 
+def summaries_concat(summary_list):
+    if len(summary_list) == 0:
+        return pd.DataFrame(columns=["Variable", "Summary"])
+
+    summaries = pd.concat(list(reversed(summary_list)), axis=0, copy=False)
+    summaries.columns = ["Variable", "Summary"]
+
+    return summaries
+
+
+def crosstabs_concat(crosstab_list):
+    kept = []
+    for crosstab in crosstab_list:
+        if kept and len(crosstab.columns) != len(kept[-1].columns):
+            kept = []
+        kept.append(crosstab)
+
+    if len(kept) == 0:
+        return pd.DataFrame()
+
+    for crosstab in kept:
+        crosstab.columns = kept[-1].columns
+
+    return pd.concat(list(reversed(kept)), copy=False)
+
+
 def crosstab_concat(crosstab1, crosstab2):
     if len(crosstab1.columns) != len(crosstab2.columns):
         crosstab2 = pd.DataFrame(columns=crosstab1.columns)
@@ -732,49 +820,61 @@ def crosstab_concat(crosstab1, crosstab2):
 
 
 def crosstab_means(sample, nominal_variable, ordinal_variable):
-    sample.means = pd.DataFrame(
-        [[pd.NA] * len(sample.crosstab.columns)], columns=sample.crosstab.columns
-    )
+    width = len(sample.one.crosstab.columns)
+    means_row = np.full(len(sample.crosstab.columns), pd.NA, dtype=object)
+    crosstab_header = sample.crosstab.columns.tolist()
 
-    for filter in sample.one.crosstab.columns:
+    for crosstab_index, filter in enumerate(sample.one.crosstab.columns):
         mean1, mean2, mean_difference = t_test(
             sample, filter, nominal_variable, ordinal_variable
         )
 
-        crosstab_index = list(sample.one.crosstab.columns).index(filter)
-
-        sample.means.iloc[
-            0, crosstab_index + 0 * len(sample.one.crosstab.columns)
-        ] = mean1
-        sample.means.iloc[
-            0, crosstab_index + 1 * len(sample.one.crosstab.columns)
-        ] = mean2
-        sample.means.iloc[
-            0, crosstab_index + 2 * len(sample.one.crosstab.columns)
-        ] = mean_difference
-
-        crosstab_header = sample.crosstab.columns.tolist()
-        crosstab_header[
-            crosstab_index + 0 * len(sample.one.crosstab.columns)
-        ] = add_sample_size(
-            filter,
-            sample.one.values
-            if filter == "All"
-            else sample.one.values[sample.one.labels[nominal_variable] == filter],
+        means_row[crosstab_index + 0 * width] = mean1
+        means_row[crosstab_index + 1 * width] = mean2
+        means_row[crosstab_index + 2 * width] = mean_difference
+
+        crosstab_header[crosstab_index + 0 * width] = add_sample_size(
+            filter, sample.one.filtered_by[filter]
         )
-        crosstab_header[
-            crosstab_index + 1 * len(sample.one.crosstab.columns)
-        ] = add_sample_size(
-            filter,
-            sample.two.values
-            if filter == "All"
-            else sample.two.values[sample.two.labels[nominal_variable] == filter],
+        crosstab_header[crosstab_index + 1 * width] = add_sample_size(
+            filter, sample.two.filtered_by[filter]
         )
-        sample.crosstab.columns = sample.means.columns = pd.Index(crosstab_header)
+
+    sample.crosstab.columns = pd.Index(crosstab_header)
+    sample.means = pd.DataFrame([means_row], columns=sample.crosstab.columns)
 
     return crosstab_concat(sample.means, sample.crosstab)
 
 
+def chi_squared_p(observed_expected):
+    """
+    P-value of Pearson's chi-squared test on a small contingency table.
+
+    Same result as scipy.stats.chi2_contingency, including the Yates
+    continuity correction at one degree of freedom, but computed with a
+    few array operations and the direct chdtrc survival function.
+    """
+    row_totals = observed_expected.sum(axis=1)
+    column_totals = observed_expected.sum(axis=0)
+    expected_frequencies = np.outer(row_totals, column_totals) / column_totals.sum()
+
+    degrees_of_freedom = (observed_expected.shape[0] - 1) * (
+        observed_expected.shape[1] - 1
+    )
+    if degrees_of_freedom == 0:
+        return 1.0
+    if degrees_of_freedom == 1:
+        corrections = expected_frequencies - observed_expected
+        observed_expected = observed_expected + np.sign(corrections) * np.minimum(
+            0.5, np.abs(corrections)
+        )
+
+    statistic = (
+        (observed_expected - expected_frequencies) ** 2 / expected_frequencies
+    ).sum()
+    return special.chdtrc(degrees_of_freedom, statistic)
+
+
 def x_test(variable, observed, expected):
     combined_index = observed.index.union(expected.index)
     observed = observed.reindex(combined_index, fill_value=0)
@@ -783,14 +883,12 @@ def x_test(variable, observed, expected):
     observed_expected = np.column_stack((observed, expected))
 
     if len(observed_expected) != 0:
-        observed_expected = observed_expected[
-            ~np.apply_along_axis(lambda y: np.all(y == 0), 1, observed_expected)
-        ]
+        observed_expected = observed_expected[observed_expected.any(axis=1)]
 
-        if not type(sum(observed_expected)) == int and not np.any(
+        if len(observed_expected) != 0 and not np.any(
             np.all(observed_expected == 0, axis=0)
         ):
-            _, P, _, _ = chi2_contingency(observed_expected)
+            P = chi_squared_p(observed_expected)
         else:
             P = np.nan
 
@@ -803,36 +901,95 @@ def x_test(variable, observed, expected):
     return variable
 
 
-def t_test(sample, filter, nominal_variable, ordinal_variable):
-    sample.one.filtered = sample.one.values
-    sample.two.filtered = sample.two.values
-
-    if not filter == "All":
-        sample.one.filtered = sample.one.values[
-            sample.one.labels[nominal_variable] == filter
+def filter_subsamples(sample, nominal_variable):
+    """
+    Slice each sample once per nominal category so every t-test in the
+    ordinal loop reuses the subsets instead of re-evaluating the mask.
+    """
+    sample.one.filtered_by = {}
+    sample.two.filtered_by = {}
+    for value in sample.metadata.value_label_order[nominal_variable]:
+        sample.one.filtered_by[value] = sample.one.values[
+            sample.one.labels[nominal_variable].to_numpy() == value
         ]
-        sample.two.filtered = sample.two.values[
-            sample.two.labels[nominal_variable] == filter
+        sample.two.filtered_by[value] = sample.two.values[
+            sample.two.labels[nominal_variable].to_numpy() == value
         ]
+    sample.one.filtered_by["All"] = sample.one.values
+    sample.two.filtered_by["All"] = sample.two.values
+
+
+def weighted_ttest_rel(differences, weights):
+    """
+    Two-sided t-test that the weighted mean of paired differences is zero.
+
+    Same math as statsmodels DescrStatsW(differences, weights).ttest_mean(0)
+    but on plain ndarrays, without the per-call object setup.
+    """
+    differences = np.asarray(differences, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+
+    sum_weights = weights.sum()
+    mean = (weights * differences).sum() / sum_weights
+    sumsquares = (weights * (differences - mean) ** 2).sum()
+    std_mean = np.sqrt(sumsquares / sum_weights) / np.sqrt(sum_weights - 1)
+
+    tstat = mean / std_mean
+    return 2 * special.stdtr(sum_weights - 1, -np.abs(tstat))
+
+
+def weighted_ttest_ind(x1, w1, x2, w2):
+    """
+    Two-sided Welch t-test for two independent weighted samples.
+
+    Same math as statsmodels ttest_ind(usevar="unequal") with Satterthwaite
+    degrees of freedom, but on plain ndarrays.
+    """
+    x1 = np.asarray(x1, dtype=float)
+    w1 = np.asarray(w1, dtype=float)
+    x2 = np.asarray(x2, dtype=float)
+    w2 = np.asarray(w2, dtype=float)
+
+    sum_weights1 = w1.sum()
+    sum_weights2 = w2.sum()
+    mean1 = (w1 * x1).sum() / sum_weights1
+    mean2 = (w2 * x2).sum() / sum_weights2
+    var1 = (w1 * (x1 - mean1) ** 2).sum() / sum_weights1
+    var2 = (w2 * (x2 - mean2) ** 2).sum() / sum_weights2
+
+    sem1 = var1 / (sum_weights1 - 1)
+    sem2 = var2 / (sum_weights2 - 1)
+    semsum = sem1 + sem2
+    dof = 1.0 / (
+        (sem1 / semsum) ** 2 / (sum_weights1 - 1)
+        + (sem2 / semsum) ** 2 / (sum_weights2 - 1)
+    )
+
+    tstat = (mean1 - mean2) / np.sqrt(semsum)
+    return 2 * special.stdtr(dof, -np.abs(tstat))
+
+
+def t_test(sample, filter, nominal_variable, ordinal_variable):
+    sample.one.filtered = sample.one.filtered_by[filter]
+    sample.two.filtered = sample.two.filtered_by[filter]
 
     sample = full_entries(sample, ordinal_variable)
 
     if sample.paired and len(sample.one.ordinal_filtered) == len(
         sample.two.ordinal_filtered
     ):
-        P = statsmodels.stats.weightstats.DescrStatsW(
-            data=sample.two.ordinal_filtered - sample.one.ordinal_filtered,
-            weights=sample.one.weights_filtered,
-        ).ttest_mean(0)[1]
+        P = weighted_ttest_rel(
+            sample.two.ordinal_filtered - sample.one.ordinal_filtered,
+            sample.one.weights_filtered,
+        )
 
     else:
-        P = statsmodels.stats.weightstats.ttest_ind(
-            x1=sample.one.ordinal_filtered,
-            x2=sample.two.ordinal_filtered,
-            alternative="two-sided",
-            usevar="unequal",
-            weights=(sample.one.weights_filtered, sample.two.weights_filtered),
-        )[1]
+        P = weighted_ttest_ind(
+            sample.one.ordinal_filtered,
+            sample.one.weights_filtered,
+            sample.two.ordinal_filtered,
+            sample.two.weights_filtered,
+        )
 
     if not sum(sample.one.weights_filtered) == 0:
         mean1 = np.average(
@@ -867,51 +1024,48 @@ def t_test(sample, filter, nominal_variable, ordinal_variable):
 def full_entries(sample, ordinal_variable):
     if (
         sample.paired
-        and not all(np.isnan(value) for value in sample.one.filtered[ordinal_variable])
-        and not all(np.isnan(value) for value in sample.two.filtered[ordinal_variable])
+        and not sample.one.filtered[ordinal_variable].isna().all()
+        and not sample.two.filtered[ordinal_variable].isna().all()
     ):
-        complete_cases = pd.concat(
-            (
-                sample.one.filtered[ordinal_variable],
-                sample.one.filtered[sample.one.weight],
-                sample.two.filtered[ordinal_variable],
-                sample.two.filtered[sample.two.weight],
-            ),
-            axis=1,
-        ).dropna()
-        sample.one.ordinal_filtered = complete_cases.groupby(level=0, axis=1).nth(0)[
-            ordinal_variable
-        ]
-        sample.one.weights_filtered = complete_cases.groupby(level=0, axis=1).nth(0)[
-            sample.one.weight
-        ]
-        sample.two.ordinal_filtered = complete_cases.groupby(level=0, axis=1).nth(1)[
-            ordinal_variable
-        ]
-        sample.two.weights_filtered = complete_cases.groupby(level=0, axis=1).nth(1)[
-            sample.two.weight
-        ]
+        shared_IDs = sample.one.filtered.index.intersection(
+            sample.two.filtered.index
+        )
+        ordinal_one = (
+            sample.one.filtered[ordinal_variable].loc[shared_IDs].to_numpy(dtype=float)
+        )
+        weights_one = (
+            sample.one.filtered[sample.one.weight].loc[shared_IDs].to_numpy(dtype=float)
+        )
+        ordinal_two = (
+            sample.two.filtered[ordinal_variable].loc[shared_IDs].to_numpy(dtype=float)
+        )
+        weights_two = (
+            sample.two.filtered[sample.two.weight].loc[shared_IDs].to_numpy(dtype=float)
+        )
+
+        complete = ~(
+            np.isnan(ordinal_one)
+            | np.isnan(weights_one)
+            | np.isnan(ordinal_two)
+            | np.isnan(weights_two)
+        )
+        sample.one.ordinal_filtered = ordinal_one[complete]
+        sample.one.weights_filtered = weights_one[complete]
+        sample.two.ordinal_filtered = ordinal_two[complete]
+        sample.two.weights_filtered = weights_two[complete]
 
     else:
-        complete_cases = pd.concat(
-            (
-                sample.one.filtered[ordinal_variable],
-                sample.one.filtered[sample.one.weight],
-            ),
-            axis=1,
-        ).dropna()
-        sample.one.ordinal_filtered = complete_cases[ordinal_variable]
-        sample.one.weights_filtered = complete_cases[sample.one.weight]
-
-        complete_cases = pd.concat(
-            (
-                sample.two.filtered[ordinal_variable],
-                sample.two.filtered[sample.two.weight],
-            ),
-            axis=1,
-        ).dropna()
-        sample.two.ordinal_filtered = complete_cases[ordinal_variable]
-        sample.two.weights_filtered = complete_cases[sample.two.weight]
+        ordinal_one = sample.one.filtered[ordinal_variable].to_numpy(dtype=float)
+        weights_one = sample.one.filtered[sample.one.weight].to_numpy(dtype=float)
+        complete = ~(np.isnan(ordinal_one) | np.isnan(weights_one))
+        sample.one.ordinal_filtered = ordinal_one[complete]
+        sample.one.weights_filtered = weights_one[complete]
+
+        ordinal_two = sample.two.filtered[ordinal_variable].to_numpy(dtype=float)
+        weights_two = sample.two.filtered[sample.two.weight].to_numpy(dtype=float)
+        complete = ~(np.isnan(ordinal_two) | np.isnan(weights_two))
+        sample.two.ordinal_filtered = ordinal_two[complete]
+        sample.two.weights_filtered = weights_two[complete]
 
     return sample
 
@@ -944,16 +1098,46 @@ def add_sample_size(variable, sample):
     return f"{variable} (n = {len(sample)})"
 
 
-def set_font(item):
-    if hasattr(item, "paragraphs"):
-        for paragraph in item.paragraphs:
-            for run in paragraph.runs:
-                run.font.name = "Arial"
-                run.font.size = Pt(10)
-    else:
-        for run in item.runs:
-            run.font.name = "Arial"
-            run.font.size = Pt(10)
+def make_run_properties():
+    run_properties = OxmlElement("w:rPr")
+    fonts = OxmlElement("w:rFonts")
+    fonts.set(qn("w:ascii"), "Arial")
+    fonts.set(qn("w:hAnsi"), "Arial")
+    size = OxmlElement("w:sz")
+    size.set(qn("w:val"), "20")
+    run_properties.append(fonts)
+    run_properties.append(size)
+    return run_properties
+
+
+run_properties_template = make_run_properties()
+
+run_properties_xml = (
+    '<w:rPr><w:rFonts w:ascii="Arial" w:hAnsi="Arial"/><w:sz w:val="20"/></w:rPr>'
+)
+
+
+def body_row_xml(values, column_width, tall):
+    """
+    Builds a complete table row as raw XML in one pass, which is far cheaper
+    than creating each cell, paragraph and run through the python-docx API.
+    """
+    cells = []
+    for position, value in enumerate(values):
+        justification = "left" if position < 2 else "center"
+        vertical = '<w:vAlign w:val="bottom"/>' if tall else ""
+        cells.append(
+            f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{column_width}"/>{vertical}</w:tcPr>'
+            f'<w:p><w:pPr><w:jc w:val="{justification}"/></w:pPr>'
+            f"<w:r>{run_properties_xml}"
+            f'<w:t xml:space="preserve">{escape(str(value))}</w:t></w:r></w:p></w:tc>'
+        )
+    return parse_xml(f'<w:tr {nsdecls("w")}>{"".join(cells)}</w:tr>')
+
+
+def set_font_paragraph(paragraph):
+    for run in paragraph.runs:
+        run._r.insert(0, copy.deepcopy(run_properties_template))
 
 
 def vertical_alignment(cell, align="bottom"):
@@ -998,11 +1182,8 @@ def dist_comparison(P):
 
 
 def plurality(percentages):
-    if percentages.apply(lambda x: "%)" in x).any():
-        percentages = percentages.apply(lambda x: x.split("%")[0][1:] + "%")
-
-    value = percentages.str.rstrip("%").astype(float).idxmax()
-    numeric = float(percentages[value].rstrip("%"))
+    value = percentages.idxmax()
+    numeric = float(percentages[value])
 
     if numeric / 100 < 0.5:
         kind = "plurality"
@@ -1045,9 +1226,7 @@ def check_labels(sample, variables):
                 f'Value labels for {missing_categories} in variable "{variable}" not found.'
             )
 
-        if type(
-            sample.metadata.column_labels[sample.metadata.column_names.index(variable)]
-        ) is type(None):
+        if type(sample.metadata.label_of[variable]) is type(None):
             raise ValueError(f'Column label for variable "{variable}" not found.')
 
 
@@ -1107,18 +1286,25 @@ def check_numeric(codebook, weights):
 
 
 class subsample:
-    def __init__(self, group, time, weight, values, labels):
+    def __init__(self, group, time, weight, values, labels, group_time_indices):
         self.group = group
         self.time = time
         self.weight = weight
         self.name = f"{group} at {time}"
+        rows = group_time_indices.get((group, time), [])
         self.values = (
-            values[(values["Group"] == group) & (values["Time"] == time)]
-            .assign(Total="Total")
-            .assign(Unweighted=1)
+            values.iloc[rows].assign(Total="Total").assign(Unweighted=1)
         )
         self.labels = (
-            labels[(values["Group"] == group) & (values["Time"] == time)]
-            .assign(Total="Total")
-            .assign(Unweighted=1)
+            labels.iloc[rows].assign(Total="Total").assign(Unweighted=1)
         )
+
+    def copy(self):
+        duplicate = subsample.__new__(subsample)
+        duplicate.group = self.group
+        duplicate.time = self.time
+        duplicate.weight = self.weight
+        duplicate.name = self.name
+        duplicate.values = self.values.copy()
+        duplicate.labels = self.labels.copy()
+        return duplicate
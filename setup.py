@@ -18,9 +18,8 @@ setuptools.setup(
     install_requires=[
         "pandas",
         "numpy",
-        "openpyxl",
+        "xlsxwriter",
         "pyreadstat",
-        "statsmodels",
         "scipy",
         "docx",
         "tqdm",